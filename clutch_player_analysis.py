@@ -6,8 +6,47 @@ from nba_api.stats.endpoints import commonplayerinfo, playerdashboardbygeneralsp
 from nba_api.stats.static import players
 import seaborn as sns
 import time
+from concurrent.futures import ThreadPoolExecutor
+import nba_cache
+import nba_kernels
 
-def analyze_clutch_player(player_name, seasons=None):
+# Clutch shot distance bins in feet, right edge inclusive; the last bin is open-ended.
+# Each season's 'shot_distance' is a (bins x 3) array of FGA, FGM and share of FGA.
+SHOT_DISTANCE_EDGES = np.array([3, 10, 16, 23])
+SHOT_DISTANCE_LABELS = ['0-3 ft', '3-10 ft', '10-16 ft', '16-23 ft', '23+ ft']
+
+# Plot style is global, so set it once rather than on every chart.
+# Figures are closed after showing, so batch runs never pile up open handles.
+sns.set_style("whitegrid")
+plt.rcParams['figure.max_open_warning'] = 0
+
+def _submit_season_requests(executor, season, player_id, store=None):
+    """
+    Dispatch all of a season's endpoint calls to the executor.
+    
+    Each future resolves to the player's rows only (empty if absent). With a
+    store, rows saved by an earlier run are read from disk instead.
+    
+    Returns:
+    --------
+    dict
+        Futures keyed by 'clutch_base', 'clutch_adv', 'shotchart' and 'regular_base'
+    """
+    fetchers = {
+        # Base for counting stats and shooting percentages, Advanced for ratings.
+        # Advanced is per-mode independent, so it shares compare_net_rating's table.
+        'clutch_base': lambda: nba_cache.player_rows(nba_cache.get_league_clutch(season, 'Base', 'Per36'), player_id),
+        'clutch_adv': lambda: nba_cache.player_rows(nba_cache.get_league_clutch(season, 'Advanced'), player_id),
+        'shotchart': lambda: nba_cache.get_clutch_shot_chart(player_id, season),
+        'regular_base': lambda: nba_cache.player_rows(
+            nba_cache.get_league_regular(season, 'Base', 'Regular Season', 'Per36'), player_id)
+    }
+    if store is None:
+        return {endpoint: executor.submit(fetch) for endpoint, fetch in fetchers.items()}
+    return {endpoint: executor.submit(store.get_or_fetch, endpoint, player_id, season, fetch)
+            for endpoint, fetch in fetchers.items()}
+
+def analyze_clutch_player(player_name, seasons=None, player_index=None, active_only=False, cache_dir=None):
     """
     Comprehensive analysis of a player's clutch performance in regular season.
     
@@ -18,6 +57,13 @@ def analyze_clutch_player(player_name, seasons=None):
     seasons : list, optional
         List of seasons to analyze (e.g., ['2020-21', '2021-22'])
         If None, will use the last 5 seasons
+    player_index : int, optional
+        Which match to use when several players share the name
+    active_only : bool, optional
+        Only consider active players when resolving the name
+    cache_dir : str or pathlib.Path, optional
+        Directory of a nba_cache.ResultsStore; the player's rows for each
+        completed season are saved there and reused on later calls
         
     Returns:
     --------
@@ -42,37 +88,17 @@ def analyze_clutch_player(player_name, seasons=None):
     }
     
     # 1. Get player info (physical attributes)
+    # First, get the player ID using the static players endpoint
+    player = nba_cache.resolve_player(player_name, player_index, active_only)
+    if player is None:
+        print(f"Could not find player ID for {player_name}")
+        return None
+    player_id = player['id']
+    print(f"Found player ID: {player_id}")
+    
     try:
-        # First, get the player ID using the static players endpoint
-        player_dict = players.find_players_by_full_name(player_name)
-        if not player_dict:
-            print(f"Could not find player ID for {player_name}")
-            return None
-        elif len(player_dict) > 1:
-            print(f"Multiple players found for {player_name}:")
-            for i, player in enumerate(player_dict):
-                print(f"{i}: {player['full_name']} (ID: {player['id']}, Active: {player['is_active']})")
-            
-            # Prompt user to select a player
-            selection = input("Enter the number of the player you want to analyze: ")
-            try:
-                selection = int(selection)
-                if 0 <= selection < len(player_dict):
-                    player_id = player_dict[selection]['id']
-                    print(f"Selected player ID: {player_id}")
-                else:
-                    print(f"Invalid selection. Please enter a number between 0 and {len(player_dict)-1}")
-                    return None
-            except ValueError:
-                print("Invalid input. Please enter a number.")
-                return None
-        else:
-            player_id = player_dict[0]['id']
-            print(f"Found player ID: {player_id}")
-        
         # Now get player info using the ID
-        player_info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
-        info_df = player_info.get_data_frames()[0]
+        info_df = nba_cache.fetch_data_frame(commonplayerinfo.CommonPlayerInfo, player_id=player_id)
         
         if not info_df.empty:
             results['player_info'] = {
@@ -87,184 +113,130 @@ def analyze_clutch_player(player_name, seasons=None):
         print(f"Error getting player info: {e}")
         return None
     
-    # Process each season
-    for season in seasons:
-        print(f"\nProcessing season: {season}")
-        season_data = {'season': season}
+    store = nba_cache.ResultsStore(cache_dir) if cache_dir is not None else None
+    
+    # Dispatch every season's requests up front so their latency overlaps,
+    # then consume the results season by season as they arrive
+    with ThreadPoolExecutor(max_workers=nba_cache.MAX_CONCURRENT_REQUESTS) as executor:
+        pending = {season: _submit_season_requests(executor, season, player_id, store)
+                   for season in seasons}
         
-        # Need to wait to avoid API rate limiting
-        time.sleep(5)
+        # Process each season
+        for season in seasons:
+            print(f"\nProcessing season: {season}")
+            season_data = {'season': season}
+            season_requests = pending[season]
 
-        # 2. Get clutch stats
-        try:
-            clutch_stats = leaguedashplayerclutch.LeagueDashPlayerClutch(
-                season=season,
-                season_type_all_star='Regular Season',
-                measure_type_detailed_defense='Base',  # Use Base for shooting percentages
-                clutch_time='Last 5 Minutes',
-                point_diff='5',
-                per_mode_detailed='Per36'
-            )
-            clutch_df = clutch_stats.get_data_frames()[0]
-            player_clutch = clutch_df[clutch_df['PLAYER_NAME'] == player_name]
-            
-            if not player_clutch.empty:
-                # Basic clutch stats
-                season_data['clutch_basic'] = {
-                    'gp': player_clutch['GP'].iloc[0],
-                    'min': player_clutch['MIN'].iloc[0],
-                    'pts': player_clutch['PTS'].iloc[0],
-                    'fg_pct': player_clutch['FG_PCT'].iloc[0],
-                    'fg3_pct': player_clutch['FG3_PCT'].iloc[0],
-                    'ft_pct': player_clutch['FT_PCT'].iloc[0],
-                    'ast': player_clutch['AST'].iloc[0],
-                    'tov': player_clutch['TOV'].iloc[0],
-                    'stl': player_clutch['STL'].iloc[0],
-                    'blk': player_clutch['BLK'].iloc[0],
-                    'dreb': player_clutch['DREB'].iloc[0],
-                    'reb': player_clutch['REB'].iloc[0],
-                    'plus_minus': player_clutch['PLUS_MINUS'].iloc[0]
-                }
-                
-                # Calculate additional ratios
-                if player_clutch['TOV'].iloc[0] > 0:
-                    season_data['clutch_basic']['ast_to_tov'] = player_clutch['AST'].iloc[0] / player_clutch['TOV'].iloc[0]
-                else:
-                    season_data['clutch_basic']['ast_to_tov'] = player_clutch['AST'].iloc[0] if player_clutch['AST'].iloc[0] > 0 else 0
-                
-                # Need to wait to avoid API rate limiting
-                time.sleep(5)
-                # Get advanced clutch stats
-                clutch_adv = leaguedashplayerclutch.LeagueDashPlayerClutch(
-                    season=season,
-                    season_type_all_star='Regular Season',
-                    measure_type_detailed_defense='Advanced',
-                    clutch_time='Last 5 Minutes',
-                    point_diff='5',
-                    per_mode_detailed='Per36'
-                )
-                clutch_adv_df = clutch_adv.get_data_frames()[0]
-                player_clutch_adv = clutch_adv_df[clutch_adv_df['PLAYER_NAME'] == player_name]
-                
-                if not player_clutch_adv.empty:
-                    season_data['clutch_advanced'] = {
-                        'usg_pct': player_clutch_adv['USG_PCT'].iloc[0],
-                        'ts_pct': player_clutch_adv['TS_PCT'].iloc[0],
-                        'net_rating': player_clutch_adv['NET_RATING'].iloc[0],
-                        'off_rating': player_clutch_adv['OFF_RATING'].iloc[0],
-                        'def_rating': player_clutch_adv['DEF_RATING'].iloc[0],
-                        'ast_pct': player_clutch_adv['AST_PCT'].iloc[0] if 'AST_PCT' in player_clutch_adv.columns else None,
-                        'pie': player_clutch_adv['PIE'].iloc[0]
-                    }
-            else:
-                print(f"No clutch data found for {player_name} in {season}")
-                continue
-                
-            # 3. Get shot distance data using shotchartdetail
+            # 2. Get clutch stats
             try:
-                # Need to wait to avoid API rate limiting
-                time.sleep(5)
-                
-                # Get shot chart data
-                shot_chart = shotchartdetail.ShotChartDetail(
-                    player_id=player_id,
-                    team_id=0,
-                    season_nullable=season,
-                    season_type_all_star='Regular Season',
-                    context_measure_simple='FGA',
-                    clutch_time_nullable='Last 5 Minutes',
-                    point_diff_nullable='5'
-                )
-                
-                shot_df = shot_chart.get_data_frames()[0]
-                
-                if not shot_df.empty:
-                    # Create distance bins
-                    shot_df['DISTANCE_BIN'] = pd.cut(
-                        shot_df['SHOT_DISTANCE'], 
-                        bins=[0, 3, 10, 16, 23, 40], 
-                        labels=['0-3 ft', '3-10 ft', '10-16 ft', '16-23 ft', '23+ ft']
-                    )
+                player_clutch = season_requests['clutch_base'].result()
+            
+                if not player_clutch.empty:
+                    clutch_row = player_clutch.iloc[0]
                     
-                    # Group by distance bin
-                    distance_stats = shot_df.groupby('DISTANCE_BIN').agg({
-                        'SHOT_MADE_FLAG': ['count', 'sum']
-                    })
+                    # Basic clutch stats
+                    season_data['clutch_basic'] = {
+                        'gp': clutch_row.GP,
+                        'min': clutch_row.MIN,
+                        'pts': clutch_row.PTS,
+                        'fg_pct': clutch_row.FG_PCT,
+                        'fg3_pct': clutch_row.FG3_PCT,
+                        'ft_pct': clutch_row.FT_PCT,
+                        'ast': clutch_row.AST,
+                        'tov': clutch_row.TOV,
+                        'stl': clutch_row.STL,
+                        'blk': clutch_row.BLK,
+                        'dreb': clutch_row.DREB,
+                        'reb': clutch_row.REB,
+                        'plus_minus': clutch_row.PLUS_MINUS,
+                        # Calculate additional ratios
+                        'ast_to_tov': clutch_row.AST / clutch_row.TOV if clutch_row.TOV > 0 else max(clutch_row.AST, 0)
+                    }
                     
-                    # Calculate percentages
-                    distance_stats.columns = ['FGA', 'FGM']
-                    distance_stats['FG_PCT'] = distance_stats['FGM'] / distance_stats['FGA']
-                    distance_stats['FGA_FREQUENCY'] = distance_stats['FGA'] / distance_stats['FGA'].sum()
+                    # Get advanced clutch stats
+                    player_clutch_adv = season_requests['clutch_adv'].result()
                     
-                    # Store in results
-                    season_data['shot_distance'] = {}
-                    for idx, row in distance_stats.iterrows():
-                        group_name = str(idx).lower().replace(' ', '_')
-                        season_data['shot_distance'][group_name] = {
-                            'fgm': row['FGM'],
-                            'fga': row['FGA'],
-                            'fg_pct': row['FG_PCT'],
-                            'pct_fga': row['FGA_FREQUENCY']
+                    if not player_clutch_adv.empty:
+                        adv_row = player_clutch_adv.iloc[0]
+                        season_data['clutch_advanced'] = {
+                            'usg_pct': adv_row.USG_PCT,
+                            'ts_pct': adv_row.TS_PCT,
+                            'net_rating': adv_row.NET_RATING,
+                            'off_rating': adv_row.OFF_RATING,
+                            'def_rating': adv_row.DEF_RATING,
+                            'ast_pct': adv_row.get('AST_PCT'),
+                            'pie': adv_row.PIE
                         }
-                # Need to wait to avoid API rate limiting
-                time.sleep(5)
+                else:
+                    print(f"No clutch data found for {player_name} in {season}")
+                    continue
+                
+                # 3. Get shot distance data using shotchartdetail
+                try:
+                    # Get shot chart data
+                    shot_df = season_requests['shotchart'].result()
+                
+                    if not shot_df.empty:
+                        # Bin shots by distance: bin i holds SHOT_DISTANCE_EDGES[i-1] < d <= SHOT_DISTANCE_EDGES[i]
+                        fga, fgm = nba_kernels.bin_shot_distances(
+                            shot_df['SHOT_DISTANCE'].to_numpy(dtype=nba_kernels.SHOT_DISTANCE_DTYPE),
+                            shot_df['SHOT_MADE_FLAG'].to_numpy(dtype=nba_kernels.SHOT_MADE_DTYPE),
+                            SHOT_DISTANCE_EDGES
+                        )
+                    
+                        # Store in results, one row per bin in SHOT_DISTANCE_LABELS order
+                        season_data['shot_distance'] = np.column_stack([fga, fgm, fga / fga.sum()])
                 
-                # 4. Compare regular season overall vs clutch
-                regular_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                    season=season,
-                    season_type_all_star='Regular Season',
-                    measure_type_detailed_defense='Base',
-                    per_mode_detailed='Per36'
-                )
-                regular_df = regular_stats.get_data_frames()[0]
-                player_regular = regular_df[regular_df['PLAYER_NAME'] == player_name]
+                    # 4. Compare regular season overall vs clutch
+                    player_regular = season_requests['regular_base'].result()
                 
-                if not player_regular.empty and not player_clutch.empty:
-                    # # Convert clutch to per game for fair comparison
-                    # clutch_per_game = player_clutch.copy()
-                    # gp = clutch_per_game['GP'].iloc[0]
-                    # if gp > 0:
-                    #     for col in ['PTS', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'AST', 'TOV', 'STL', 'BLK']:
-                    #         if col in clutch_per_game.columns:
-                    #             clutch_per_game[col] = clutch_per_game[col] / gp
+                    if not player_regular.empty and not player_clutch.empty:
+                        # # Convert clutch to per game for fair comparison
+                        # clutch_per_game = player_clutch.copy()
+                        # gp = clutch_per_game['GP'].iloc[0]
+                        # if gp > 0:
+                        #     for col in ['PTS', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'AST', 'TOV', 'STL', 'BLK']:
+                        #         if col in clutch_per_game.columns:
+                        #             clutch_per_game[col] = clutch_per_game[col] / gp
                     
-                    season_data['regular_vs_clutch_'] = {
-                        'regular': {
-                            'pts': player_regular['PTS'].iloc[0],
-                            'fg_pct': player_regular['FG_PCT'].iloc[0],
-                            'fg3_pct': player_regular['FG3_PCT'].iloc[0],
-                            'ft_pct': player_regular['FT_PCT'].iloc[0],
-                            'ast': player_regular['AST'].iloc[0],
-                            'tov': player_regular['TOV'].iloc[0],
-                            'ast_to_tov': player_regular['AST'].iloc[0] / player_regular['TOV'].iloc[0] if player_regular['TOV'].iloc[0] > 0 else player_regular['AST'].iloc[0],
-                            'dreb': player_regular['DREB'].iloc[0],
-                            'reb': player_regular['REB'].iloc[0],
-                            'stl': player_regular['STL'].iloc[0],  # Added steals
-                            'blk': player_regular['BLK'].iloc[0]   # Added blocks
-                        },
-                        'clutch': {
-                            'pts': player_clutch['PTS'].iloc[0],
-                            'fg_pct': player_clutch['FG_PCT'].iloc[0],
-                            'fg3_pct': player_clutch['FG3_PCT'].iloc[0],
-                            'ft_pct': player_clutch['FT_PCT'].iloc[0],
-                            'ast': player_clutch['AST'].iloc[0],
-                            'tov': player_clutch['TOV'].iloc[0],
-                            'ast_to_tov': season_data['clutch_basic']['ast_to_tov'],
-                            'dreb': player_clutch['DREB'].iloc[0],
-                            'reb': player_clutch['REB'].iloc[0],
-                            'stl': player_clutch['STL'].iloc[0],  # Added steals
-                            'blk': player_clutch['BLK'].iloc[0]   # Added blocks
+                        regular_row = player_regular.iloc[0]
+                        season_data['regular_vs_clutch_'] = {
+                            'regular': {
+                                'pts': regular_row.PTS,
+                                'fg_pct': regular_row.FG_PCT,
+                                'fg3_pct': regular_row.FG3_PCT,
+                                'ft_pct': regular_row.FT_PCT,
+                                'ast': regular_row.AST,
+                                'tov': regular_row.TOV,
+                                'ast_to_tov': regular_row.AST / regular_row.TOV if regular_row.TOV > 0 else regular_row.AST,
+                                'dreb': regular_row.DREB,
+                                'reb': regular_row.REB,
+                                'stl': regular_row.STL,  # Added steals
+                                'blk': regular_row.BLK   # Added blocks
+                            },
+                            'clutch': {
+                                'pts': clutch_row.PTS,
+                                'fg_pct': clutch_row.FG_PCT,
+                                'fg3_pct': clutch_row.FG3_PCT,
+                                'ft_pct': clutch_row.FT_PCT,
+                                'ast': clutch_row.AST,
+                                'tov': clutch_row.TOV,
+                                'ast_to_tov': season_data['clutch_basic']['ast_to_tov'],
+                                'dreb': clutch_row.DREB,
+                                'reb': clutch_row.REB,
+                                'stl': clutch_row.STL,  # Added steals
+                                'blk': clutch_row.BLK   # Added blocks
+                            }
                         }
-                    }
                 
-            except Exception as e:
-                print(f"Error getting shot distance data: {e}")
+                except Exception as e:
+                    print(f"Error getting shot distance data: {e}")
             
-            # Add season data to results
-            results['clutch_stats'].append(season_data)
+                # Add season data to results
+                results['clutch_stats'].append(season_data)
             
-        except Exception as e:
-            print(f"Error processing season {season}: {e}")
+            except Exception as e:
+                print(f"Error processing season {season}: {e}")
     
     # 5. Visualize the results
     if results['clutch_stats']:
@@ -283,80 +255,83 @@ def visualize_player_analysis(results):
     """
     player_name = results['player_name']
     
-    # Set up the style
-    sns.set_style("whitegrid")
-    plt.figure(figsize=(20, 15))
-    
-    # 1. Shooting percentages over seasons
-    plt.subplot(2, 2, 1)
-    seasons = []
-    fg_pcts = []
-    fg3_pcts = []
-    ft_pcts = []
+    # Collect what every chart needs in a single pass over the seasons
+    def_stats = ['stl', 'blk', 'dreb', 'reb']
+    shoot_seasons, shoot_rows = [], []  # clutch FG%, 3FG%, FT%
+    adv_seasons, adv_rows = [], []      # clutch NET rating, USG%, TS%
+    clutch_def_rows = []
+    rvc_rows = []
+    shot_rows = []
     
     for season_data in results['clutch_stats']:
         if 'clutch_basic' in season_data:
-            seasons.append(season_data['season'])
-            fg_pcts.append(season_data['clutch_basic']['fg_pct'])
-            fg3_pcts.append(season_data['clutch_basic']['fg3_pct'])
-            ft_pcts.append(season_data['clutch_basic']['ft_pct'])
+            basic = season_data['clutch_basic']
+            shoot_seasons.append(season_data['season'])
+            shoot_rows.append((basic['fg_pct'], basic['fg3_pct'], basic['ft_pct']))
+            clutch_def_rows.append([basic[stat] for stat in def_stats])
+        if 'clutch_advanced' in season_data:
+            adv = season_data['clutch_advanced']
+            adv_seasons.append(season_data['season'])
+            adv_rows.append((adv['net_rating'], adv['usg_pct'] * 100, adv['ts_pct'] * 100))  # Convert to percentage
+        if 'regular_vs_clutch_' in season_data:
+            for scope in ('regular', 'clutch'):
+                rvc_rows.append({'season': season_data['season'], 'scope': scope,
+                                 **season_data['regular_vs_clutch_'][scope]})
+        if 'shot_distance' in season_data:
+            shot_rows.append(season_data['shot_distance'])
+    
+    shoot = np.array(shoot_rows, dtype=np.float64).reshape(-1, 3)
+    adv = np.array(adv_rows, dtype=np.float64).reshape(-1, 3)
+    
+    # Per-scope averages across seasons, from a long-form frame
+    rvc_means = pd.DataFrame(rvc_rows).groupby('scope').mean(numeric_only=True) if rvc_rows else None
+    
+    fig, axes = plt.subplots(2, 2, figsize=(20, 15), constrained_layout=True)
     
+    # 1. Shooting percentages over seasons
+    ax = axes[0][0]
+    seasons = shoot_seasons
     x = np.arange(len(seasons))
     width = 0.25
     
-    plt.bar(x - width, fg_pcts, width, label='FG%')
-    plt.bar(x, fg3_pcts, width, label='3FG%')
-    plt.bar(x + width, ft_pcts, width, label='FT%')
+    ax.bar(x - width, shoot[:, 0], width, label='FG%')
+    ax.bar(x, shoot[:, 1], width, label='3FG%')
+    ax.bar(x + width, shoot[:, 2], width, label='FT%')
     
-    plt.xlabel('Season')
-    plt.ylabel('Percentage')
-    plt.title(f"{player_name}'s Clutch Shooting Percentages")
-    plt.xticks(x, seasons, rotation=45)
-    plt.legend()
+    ax.set_xlabel('Season')
+    ax.set_ylabel('Percentage')
+    ax.set_title(f"{player_name}'s Clutch Shooting Percentages")
+    ax.set_xticks(x)
+    ax.set_xticklabels(seasons, rotation=45)
+    ax.legend()
     
-   # 2. Regular vs Clutch comparison (all selected seasons)
+    # 2. Regular vs Clutch comparison (all selected seasons)
     if results['clutch_stats']:
-        plt.subplot(2, 2, 2)
+        ax1 = axes[0][1]
         
-        # Calculate averages across all seasons
         metrics = ['pts', 'fg_pct', 'fg3_pct', 'ft_pct', 'ast', 'tov', 'ast_to_tov']
-        regular_avgs = {m: 0 for m in metrics}
-        clutch_avgs = {m: 0 for m in metrics}
-        count = 0
-        
-        for season_data in results['clutch_stats']:
-            if 'regular_vs_clutch_' in season_data:
-                count += 1
-                for m in metrics:
-                    regular_avgs[m] += season_data['regular_vs_clutch_']['regular'][m]
-                    clutch_avgs[m] += season_data['regular_vs_clutch_']['clutch'][m]
         
-        # Calculate the averages
-        if count > 0:
+        if rvc_means is not None:
             # Separate percentage metrics from counting stats
             pct_metrics = ['fg_pct', 'fg3_pct', 'ft_pct']
             count_metrics = [m for m in metrics if m not in pct_metrics]
+            metric_labels = [m.upper().replace('_', ' ') for m in count_metrics + pct_metrics]
             
-            # Create figure with two y-axes
-            ax1 = plt.gca()
+            # Second y-axis for the percentages
             ax2 = ax1.twinx()
             
             # Plot counting stats
             x_count = np.arange(len(count_metrics))
             width = 0.35
-            regular_count_vals = [regular_avgs[m] / count for m in count_metrics]
-            clutch_count_vals = [clutch_avgs[m] / count for m in count_metrics]
             
-            ax1.bar(x_count - width/2, regular_count_vals, width, label='Regular', color='royalblue')
-            ax1.bar(x_count + width/2, clutch_count_vals, width, label='Clutch', color='orangered')
+            ax1.bar(x_count - width/2, rvc_means.loc['regular', count_metrics], width, label='Regular', color='royalblue')
+            ax1.bar(x_count + width/2, rvc_means.loc['clutch', count_metrics], width, label='Clutch', color='orangered')
             
             # Plot percentage stats
             x_pct = np.arange(len(count_metrics), len(count_metrics) + len(pct_metrics))
-            regular_pct_vals = [regular_avgs[m] / count for m in pct_metrics]
-            clutch_pct_vals = [clutch_avgs[m] / count for m in pct_metrics]
             
-            ax2.bar(x_pct - width/2, regular_pct_vals, width, label='Regular', color='lightblue')
-            ax2.bar(x_pct + width/2, clutch_pct_vals, width, label='Clutch', color='lightsalmon')
+            ax2.bar(x_pct - width/2, rvc_means.loc['regular', pct_metrics], width, label='Regular', color='lightblue')
+            ax2.bar(x_pct + width/2, rvc_means.loc['clutch', pct_metrics], width, label='Clutch', color='lightsalmon')
             
             # Set labels and title
             ax1.set_xlabel('Metric')
@@ -364,80 +339,42 @@ def visualize_player_analysis(results):
             ax2.set_ylabel('Percentage')
             
             seasons_range = f"{results['seasons'][0]} to {results['seasons'][-1]}"
-            plt.title(f"{player_name}'s Regular vs Clutch Performance (Per 36, {seasons_range})")
+            ax1.set_title(f"{player_name}'s Regular vs Clutch Performance (Per 36, {seasons_range})")
             
             # Set x-ticks for all metrics
             all_x = np.arange(len(metrics))
-            plt.xticks(all_x, [m.upper().replace('_', ' ') for m in count_metrics + pct_metrics], rotation=45)
+            ax1.set_xticks(all_x)
+            ax1.set_xticklabels(metric_labels, rotation=45)
             
             # Add legends
             ax1.legend(loc='upper left')
             ax2.legend(loc='upper right')
     
     # 3. Shot distance breakdown (season average from clutch stats)
-    if results['clutch_stats']:
-        plt.subplot(2, 2, 3)
-        
-        # Initialize dictionaries to store averages
-        distance_data = {}
+    if shot_rows:
+        ax1 = axes[1][0]
         
-        # Collect data from all seasons
-        for season_data in results['clutch_stats']:
-            if 'shot_distance' in season_data:
-                for distance, stats in season_data['shot_distance'].items():
-                    if distance not in distance_data:
-                        distance_data[distance] = {'pct_fga': 0, 'fg_pct': 0, 'count': 0, 'fga': 0}
-                    
-                    distance_data[distance]['pct_fga'] += stats['pct_fga']
-                    # Only add fg_pct if shots were attempted
-                    if stats.get('fga', 0) > 0:
-                        distance_data[distance]['fg_pct'] += stats['fg_pct']
-                        distance_data[distance]['fga'] += stats.get('fga', 0)
-                    distance_data[distance]['count'] += 1
-        
-        # Calculate averages
-        distances = []
-        pct_fga = []
-        fg_pct = []
-        valid_indices = []  # Track indices with valid FG% data
-        
-        for distance, stats in distance_data.items():
-            if stats['count'] > 0:
-                distances.append(distance)
-                pct_fga.append(stats['pct_fga'] / stats['count'])
-                # Only calculate average if there were shots attempted
-                if stats.get('fga', 0) > 0:
-                    fg_pct.append(stats['fg_pct'] / stats['count'])
-                    valid_indices.append(len(distances) - 1)
-                else:
-                    fg_pct.append(None)  # Use None for missing data
+        # Stack seasons into (seasons, bins) arrays; bins are already ordered by distance
+        fga, fgm, season_pct_fga = np.moveaxis(np.stack(shot_rows), 2, 0)
+        pct_fga = season_pct_fga.mean(axis=0)
         
-        # Sort distances properly
-        distance_order = ['0-3_ft', '3-10_ft', '10-16_ft', '16-23_ft', '23+_ft']
-        sorted_indices = [distances.index(d) for d in distance_order if d in distances]
-        distances = [distances[i] for i in sorted_indices]
-        pct_fga = [pct_fga[i] for i in sorted_indices]
+        # Average FG% only over seasons that had attempts in the bin, NaN if none did
+        attempted = fga > 0
+        season_fg_pct = np.divide(fgm, fga, out=np.zeros_like(fgm), where=attempted)
+        seasons_attempted = attempted.sum(axis=0)
+        fg_pct = np.divide(season_fg_pct.sum(axis=0), seasons_attempted,
+                           out=np.full(len(SHOT_DISTANCE_LABELS), np.nan), where=seasons_attempted > 0)
         
-        # Remap valid indices and fg_pct after sorting
-        old_to_new = {old: new for new, old in enumerate(sorted_indices)}
-        valid_indices = [old_to_new[i] for i in valid_indices if i in old_to_new]
-        fg_pct = [fg_pct[i] for i in sorted_indices]
-        
-        # Create a figure with two y-axes
-        ax1 = plt.gca()
+        # Second y-axis for FG%
         ax2 = ax1.twinx()
         
         # Plot data
-        x = np.arange(len(distances))
+        x = np.arange(len(SHOT_DISTANCE_LABELS))
         ax1.bar(x, pct_fga, 0.4, color='skyblue', label='% of FGA')
         
         # Plot only valid FG% points with markers
-        valid_x = []
-        valid_fg_pct = []
-        for i in range(len(x)):
-            if fg_pct[i] is not None:
-                valid_x.append(x[i])
-                valid_fg_pct.append(fg_pct[i])
+        valid_x = np.flatnonzero(~np.isnan(fg_pct))
+        valid_fg_pct = fg_pct[valid_x]
         
         # Plot points with large markers
         ax2.scatter(valid_x, valid_fg_pct, color='red', s=80, zorder=3, label='FG%')
@@ -452,97 +389,76 @@ def visualize_player_analysis(results):
         ax1.set_ylabel('% of Field Goal Attempts', color='skyblue')
         ax2.set_ylabel('Field Goal %', color='red')
         seasons_range = f"{results['seasons'][0]} to {results['seasons'][-1]}"
-        plt.title(f"{player_name}'s Clutch Shot Distance Breakdown ({seasons_range})")
-        plt.xticks(x, [d.replace('_', ' ').title() for d in distances], rotation=45)
+        ax1.set_title(f"{player_name}'s Clutch Shot Distance Breakdown ({seasons_range})")
+        ax1.set_xticks(x)
+        ax1.set_xticklabels([label.title() for label in SHOT_DISTANCE_LABELS], rotation=45)
         
         # Add legends
         ax1.legend(loc='upper left')
         ax2.legend(loc='upper right')
     
     # 4. Advanced metrics over seasons
-    plt.subplot(2, 2, 4)
-    seasons = []
-    net_ratings = []
-    usg_pcts = []
-    ts_pcts = []
-    
-    for season_data in results['clutch_stats']:
-        if 'clutch_advanced' in season_data:
-            seasons.append(season_data['season'])
-            net_ratings.append(season_data['clutch_advanced']['net_rating'])
-            usg_pcts.append(season_data['clutch_advanced']['usg_pct'] * 100)  # Convert to percentage
-            ts_pcts.append(season_data['clutch_advanced']['ts_pct'] * 100)    # Convert to percentage
-    
+    ax = axes[1][1]
+    seasons = adv_seasons
     x = np.arange(len(seasons))
     
-    plt.plot(x, net_ratings, 'bo-', label='NET Rating')
-    plt.plot(x, usg_pcts, 'go-', label='USG%')
-    plt.plot(x, ts_pcts, 'ro-', label='TS%')
+    ax.plot(x, adv[:, 0], 'bo-', label='NET Rating')
+    ax.plot(x, adv[:, 1], 'go-', label='USG%')
+    ax.plot(x, adv[:, 2], 'ro-', label='TS%')
     
-    plt.xlabel('Season')
-    plt.ylabel('Value')
-    plt.title(f"{player_name}'s Advanced Clutch Metrics")
-    plt.xticks(x, seasons, rotation=45)
-    plt.legend()
+    ax.set_xlabel('Season')
+    ax.set_ylabel('Value')
+    ax.set_title(f"{player_name}'s Advanced Clutch Metrics")
+    ax.set_xticks(x)
+    ax.set_xticklabels(seasons, rotation=45)
+    ax.legend()
     
-    plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
 
     # 5. Defensive Metrics in the clutch
-    plt.figure(figsize=(12, 6))
+    fig, ax = plt.subplots(figsize=(12, 6), constrained_layout=True)
     
     # Prepare defensive stats data
-    def_stats = ['stl', 'blk', 'dreb', 'reb']
     def_labels = ['Steals', 'Blocks', 'Defensive Rebounds', 'Total Rebounds'] 
     
     # Calculate averages across seasons
-    clutch_def_stats = []
-    regular_def_stats = []
-    
-    for stat in def_stats:
-        # Clutch stats
-        clutch_avg = np.mean([season_data['clutch_basic'][stat] 
-                            for season_data in results['clutch_stats'] 
-                            if 'clutch_basic' in season_data])
-        clutch_def_stats.append(clutch_avg)
-        
-        # Regular stats
-        regular_avg = np.mean([season_data['regular_vs_clutch_']['regular'][stat]
-                             for season_data in results['clutch_stats']
-                             if 'regular_vs_clutch_' in season_data])
-        regular_def_stats.append(regular_avg)
+    clutch_def_stats = np.array(clutch_def_rows, dtype=np.float64).reshape(-1, len(def_stats)).mean(axis=0)
+    regular_def_stats = (rvc_means.loc['regular', def_stats].to_numpy() if rvc_means is not None
+                         else np.full(len(def_stats), np.nan))
     
-    x = range(len(def_stats))
+    x = np.arange(len(def_stats))
     width = 0.35
     
     # Create grouped bar chart
-    plt.bar([i - width/2 for i in x], regular_def_stats, width, label='Regular', 
-            color='darkgreen', alpha=0.7)
-    plt.bar([i + width/2 for i in x], clutch_def_stats, width, label='Clutch',
-            color='purple', alpha=0.7)
+    regular_bars = ax.bar(x - width/2, regular_def_stats, width, label='Regular', 
+                          color='darkgreen', alpha=0.7)
+    clutch_bars = ax.bar(x + width/2, clutch_def_stats, width, label='Clutch',
+                         color='purple', alpha=0.7)
     
-    plt.xlabel('Defensive Statistics')
-    plt.ylabel('Per Game Average (Per 36 Min)')
+    ax.set_xlabel('Defensive Statistics')
+    ax.set_ylabel('Per Game Average (Per 36 Min)')
     seasons_range = f"{results['seasons'][0]} to {results['seasons'][-1]}"
-    plt.title(f"{player_name}'s Regular vs Clutch Defensive Stats ({seasons_range})")
+    ax.set_title(f"{player_name}'s Regular vs Clutch Defensive Stats ({seasons_range})")
     
-    plt.xticks(x, def_labels, rotation=45)
-    plt.legend()
+    ax.set_xticks(x)
+    ax.set_xticklabels(def_labels, rotation=45)
+    ax.legend()
     
     # Add value labels on top of bars
     def autolabel(rects):
         for rect in rects:
             height = rect.get_height()
-            plt.text(rect.get_x() + rect.get_width()/2., height,
+            ax.text(rect.get_x() + rect.get_width()/2., height,
                     f'{height:.1f}',
                     ha='center', va='bottom')
     
-    autolabel(plt.gca().patches[:len(def_stats)])  # Regular stats
-    autolabel(plt.gca().patches[len(def_stats):])  # Clutch stats
+    autolabel(regular_bars)  # Regular stats
+    autolabel(clutch_bars)   # Clutch stats
     
-    plt.tight_layout()
     plt.show()
+    plt.close(fig)
     
     # Print player info
     if results['player_info']:
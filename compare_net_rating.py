@@ -5,8 +5,46 @@ from nba_api.stats.endpoints import leaguedashplayerclutch, leaguedashplayerstat
 from nba_api.stats.static import players
 import seaborn as sns
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import nba_cache
 
-def compare_net_rating(player_name, seasons=None):
+# One-time plot setup; visualize_net_rating_comparison closes its figure when done
+sns.set_style("whitegrid")
+plt.rcParams['figure.max_open_warning'] = 0
+
+# Game situations in column order, with the wording used in progress messages
+SITUATION_LABELS = {'Regular Season': 'regular season', 'Clutch': 'clutch', 'Playoffs': 'playoff'}
+
+# ResultsStore endpoint names; 'clutch_adv' rows are also stored by analyze_clutch_player
+SITUATION_ENDPOINTS = {'Regular Season': 'regular_adv', 'Clutch': 'clutch_adv', 'Playoffs': 'playoffs_adv'}
+
+def _fetch_regular(player_id, season, season_type):
+    """
+    Player's full-game Advanced rows for the season type, empty if they have none.
+    """
+    return nba_cache.player_rows(nba_cache.get_league_regular(season, 'Advanced', season_type), player_id)
+
+def _fetch_clutch(player_id, season):
+    """
+    Player's regular season clutch Advanced rows, empty if they have none.
+    """
+    return nba_cache.player_rows(nba_cache.get_league_clutch(season, 'Advanced'), player_id)
+
+def _fetch_net_rating(player_id, season, situation, store=None):
+    """
+    Player's NET_RATING for the season and situation, or None if they have no row.
+    """
+    if situation == 'Clutch':
+        fetch = lambda: _fetch_clutch(player_id, season)
+    else:
+        fetch = lambda: _fetch_regular(player_id, season, situation)
+    if store is None:
+        rows = fetch()
+    else:
+        rows = store.get_or_fetch(SITUATION_ENDPOINTS[situation], player_id, season, fetch)
+    return None if rows.empty else rows['NET_RATING'].iloc[0]
+
+def compare_net_rating(player_name, seasons=None, player_index=None, active_only=False, cache_dir=None):
     """
     Compare a player's NET_RATING across regular season, clutch, and playoffs.
     
@@ -17,6 +55,13 @@ def compare_net_rating(player_name, seasons=None):
     seasons : list, optional
         List of seasons to analyze (e.g., ['2020-21', '2021-22'])
         If None, will use the last 5 seasons
+    player_index : int, optional
+        Which match to use when several players share the name
+    active_only : bool, optional
+        Only consider active players when resolving the name
+    cache_dir : str or pathlib.Path, optional
+        Directory of a nba_cache.ResultsStore; pass the same one given to
+        analyze_clutch_player to reuse the clutch rows it stored
         
     Returns:
     --------
@@ -31,107 +76,37 @@ def compare_net_rating(player_name, seasons=None):
     print(f"Comparing {player_name}'s NET_RATING for seasons: {', '.join(seasons)}")
     
     # Get player ID
-    player_dict = players.find_players_by_full_name(player_name)
-    if not player_dict:
+    player = nba_cache.resolve_player(player_name, player_index, active_only)
+    if player is None:
         print(f"Could not find player ID for {player_name}")
         return None
-    elif len(player_dict) > 1:
-        print(f"Multiple players found for {player_name}:")
-        for i, player in enumerate(player_dict):
-            print(f"{i}: {player['full_name']} (ID: {player['id']}, Active: {player['is_active']})")
-        
-        # Prompt user to select a player
-        selection = input("Enter the number of the player you want to analyze: ")
-        try:
-            selection = int(selection)
-            if 0 <= selection < len(player_dict):
-                player_id = player_dict[selection]['id']
-                print(f"Selected player ID: {player_id}")
-            else:
-                print(f"Invalid selection. Please enter a number between 0 and {len(player_dict)-1}")
-                return None
-        except ValueError:
-            print("Invalid input. Please enter a number.")
-            return None
-    else:
-        player_id = player_dict[0]['id']
-        print(f"Found player ID: {player_id}")
-    
-    # Initialize results
-    results = []
-    
-    # Process each season
-    for season in seasons:
-        print(f"\nProcessing season: {season}")
-        season_data = {'Season': season}
-        
-        # 1. Get regular season stats
-        try:
-            regular_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season,
-                season_type_all_star='Regular Season',
-                measure_type_detailed_defense='Advanced'
-            )
-            regular_df = regular_stats.get_data_frames()[0]
-            player_regular = regular_df[regular_df['PLAYER_NAME'] == player_name]
-            
-            if not player_regular.empty:
-                season_data['Regular Season'] = player_regular['NET_RATING'].iloc[0]
-            else:
-                print(f"No regular season data found for {player_name} in {season}")
-                season_data['Regular Season'] = None
-        except Exception as e:
-            print(f"Error getting regular season stats: {e}")
-            season_data['Regular Season'] = None
-        
-        # 2. Get clutch stats
-        try:
-            clutch_stats = leaguedashplayerclutch.LeagueDashPlayerClutch(
-                season=season,
-                season_type_all_star='Regular Season',
-                measure_type_detailed_defense='Advanced',
-                clutch_time='Last 5 Minutes',
-                point_diff='5'
-            )
-            clutch_df = clutch_stats.get_data_frames()[0]
-            player_clutch = clutch_df[clutch_df['PLAYER_NAME'] == player_name]
-            
-            if not player_clutch.empty:
-                season_data['Clutch'] = player_clutch['NET_RATING'].iloc[0]
-            else:
-                print(f"No clutch data found for {player_name} in {season}")
-                season_data['Clutch'] = None
-        except Exception as e:
-            print(f"Error getting clutch stats: {e}")
-            season_data['Clutch'] = None
-        
-        # 3. Get playoff stats
-        try:
-            playoff_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season,
-                season_type_all_star='Playoffs',
-                measure_type_detailed_defense='Advanced'
-            )
-            playoff_df = playoff_stats.get_data_frames()[0]
-            player_playoff = playoff_df[playoff_df['PLAYER_NAME'] == player_name]
-            
-            if not player_playoff.empty:
-                season_data['Playoffs'] = player_playoff['NET_RATING'].iloc[0]
-            else:
-                print(f"No playoff data found for {player_name} in {season}")
-                season_data['Playoffs'] = None
-        except Exception as e:
-            print(f"Error getting playoff stats: {e}")
-            season_data['Playoffs'] = None
-        
-        # Add to results
-        results.append(season_data)
-        
-        # Add delay to avoid rate limiting
-        time.sleep(1)
+    player_id = player['id']
+    print(f"Found player ID: {player_id}")
+    
+    # Every (season, situation) lookup is independent, so submit them all at once;
+    # missing or failed lookups stay NaN
+    situations = list(SITUATION_LABELS)
+    store = nba_cache.ResultsStore(cache_dir) if cache_dir is not None else None
+    mat = np.full((len(seasons), len(situations)), np.nan, dtype=np.float64)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = {
+            executor.submit(_fetch_net_rating, player_id, season, situation, store): (i, j)
+            for i, season in enumerate(seasons) for j, situation in enumerate(situations)
+        }
+        for future in as_completed(futures):
+            i, j = futures[future]
+            label = SITUATION_LABELS[situations[j]]
+            try:
+                net_rating = future.result()
+                if net_rating is None:
+                    print(f"No {label} data found for {player_name} in {seasons[i]}")
+                else:
+                    mat[i, j] = net_rating
+            except Exception as e:
+                print(f"Error getting {label} stats for {seasons[i]}: {e}")
     
     # Convert to DataFrame
-    results_df = pd.DataFrame(results)
+    results_df = pd.DataFrame(mat, index=pd.Index(seasons, name='Season'), columns=situations).reset_index()
     
     # Visualize the results
     visualize_net_rating_comparison(results_df, player_name)
@@ -149,9 +124,7 @@ def visualize_net_rating_comparison(df, player_name):
     player_name : str
         Player name for the title
     """
-    # Set up the style
-    sns.set_style("whitegrid")
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
     
     # Melt the DataFrame for easier plotting
     df_melted = df.melt(id_vars=['Season'], var_name='Game Situation', value_name='NET_RATING')
@@ -171,6 +144,7 @@ def visualize_net_rating_comparison(df, player_name):
     # Adjust layout and show
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
     
     # Print summary
     print("\nNET_RATING Summary:")
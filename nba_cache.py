@@ -0,0 +1,363 @@
+"""
+Shared caching for NBA stats requests.
+
+Importing this module points nba_api at a requests-cache session backed by
+SQLite, so stats that have already been downloaded are served from disk on
+later runs instead of hitting stats.nba.com again.
+
+League-wide tables are also memoized per process, so analyzing several
+players over the same seasons downloads each table only once, even when
+several threads ask for it at the same time. A ResultsStore keeps each
+player's rows as Parquet files for reuse across runs and scripts.
+"""
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, timedelta
+from functools import lru_cache, wraps
+from pathlib import Path
+
+import pandas as pd
+import requests
+import requests_cache
+from nba_api.stats.endpoints import leaguedashplayerclutch, leaguedashplayerstats, shotchartdetail
+from nba_api.stats.library.http import NBAStatsHTTP
+from nba_api.stats.static import players
+
+import nba_kernels
+
+def current_season(today=None):
+    """
+    Return the NBA season in progress (e.g. '2024-25') on the given date.
+
+    Parameters:
+    -----------
+    today : datetime.date, optional
+        Date to evaluate; defaults to today. Seasons roll over in October.
+    """
+    today = today or date.today()
+    start_year = today.year if today.month >= 10 else today.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+CACHE_NAME = 'nba_cache'
+
+# Completed seasons never change, the current one updates nightly
+HISTORICAL_EXPIRE_AFTER = timedelta(days=30)
+CURRENT_SEASON_EXPIRE_AFTER = timedelta(seconds=600)
+PLAYER_INFO_EXPIRE_AFTER = timedelta(days=7)
+
+# Matched in order against the full request URL, query string included
+URLS_EXPIRE_AFTER = {
+    'stats.nba.com/stats/commonplayerinfo': PLAYER_INFO_EXPIRE_AFTER,
+    re.compile(r'[?&]Season=' + re.escape(current_season()) + r'(&|$)'): CURRENT_SEASON_EXPIRE_AFTER,
+}
+
+_last_response = threading.local()
+
+class _NBACachedSession(requests_cache.CachedSession):
+    """
+    CachedSession that records, per thread, whether the last response came from the cache.
+    """
+    def request(self, *args, **kwargs):
+        response = super().request(*args, **kwargs)
+        _last_response.from_cache = getattr(response, 'from_cache', False)
+        return response
+
+session = _NBACachedSession(
+    CACHE_NAME,
+    backend='sqlite',
+    expire_after=HISTORICAL_EXPIRE_AFTER,
+    urls_expire_after=URLS_EXPIRE_AFTER,
+    allowable_methods=('GET',),
+    match_headers=False
+)
+NBAStatsHTTP.set_session(session)
+
+def last_response_from_cache():
+    """
+    Whether the most recent stats request made on this thread was a cache hit.
+
+    Callers use this to skip rate-limit pauses that only matter for real network calls.
+    """
+    return getattr(_last_response, 'from_cache', False)
+
+# Exact full-name lookup table; a list per name since some names are shared
+_NAME_INDEX = {}
+for _player in players.get_players():
+    _NAME_INDEX.setdefault(_player['full_name'].lower(), []).append(_player)
+
+@lru_cache(maxsize=None)
+def _scan_players(player_name):
+    return players.find_players_by_full_name(player_name)
+
+def find_players(player_name):
+    """
+    Players whose full name matches player_name.
+
+    Exact (case-insensitive) names are a dict lookup; anything else falls back
+    to nba_api's partial-match scan over every player, memoized per name.
+    """
+    return _NAME_INDEX.get(player_name.lower()) or _scan_players(player_name)
+
+def resolve_player(player_name, player_index=None, active_only=False):
+    """
+    Pick the single player record meant by player_name, without prompting.
+
+    Parameters:
+    -----------
+    player_name : str
+        Full name of the player (e.g., 'Chris Paul')
+    player_index : int, optional
+        Which match to use when several players share the name
+    active_only : bool, optional
+        Only consider active players
+
+    Returns:
+    --------
+    dict or None
+        The nba_api player record, or None if nobody matches
+
+    Raises:
+    -------
+    ValueError
+        If several players match and player_index doesn't select one of them
+    """
+    matches = find_players(player_name)
+    if active_only:
+        matches = [p for p in matches if p['is_active']]
+    if len(matches) <= 1:
+        return matches[0] if matches else None
+    if player_index is None or not 0 <= player_index < len(matches):
+        listing = '\n'.join(f"{i}: {p['full_name']} (ID: {p['id']}, Active: {p['is_active']})"
+                            for i, p in enumerate(matches))
+        raise ValueError(f"Multiple players found for {player_name}, pass player_index "
+                         f"between 0 and {len(matches)-1} to pick one:\n{listing}")
+    return matches[player_index]
+
+# stats.nba.com starts refusing connections when hit too hard, so concurrent
+# requests share one semaphore instead of sleeping before every call
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_SPACING = 0.6  # seconds each network request holds its slot afterwards
+_api_semaphore = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+REQUEST_TIMEOUT = 15  # seconds; a stalled request fails fast into a retry instead of hanging
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8
+
+def fetch_data_frame(endpoint_cls, **kwargs):
+    """
+    Call an nba_api endpoint under the shared rate limiter and return its first result set.
+
+    Failed calls are retried with exponential backoff and decorrelated jitter,
+    starting around BACKOFF_BASE seconds and capped at BACKOFF_CAP, so
+    throttled threads don't all come back at the same moment. nba_api does
+    not raise on HTTP errors, so a throttled request shows up as a non-JSON
+    body (ValueError), a timeout or a dropped connection.
+    """
+    delay = BACKOFF_BASE
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            with _api_semaphore:
+                df = endpoint_cls(timeout=REQUEST_TIMEOUT, **kwargs).get_data_frames()[0]
+                # Cache hits never reached stats.nba.com, so there is nothing to space out
+                if not last_response_from_cache():
+                    time.sleep(REQUEST_SPACING)
+                return df
+        except (requests.exceptions.RequestException, ValueError):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        # Back off outside the semaphore so other requests can use the slot
+        delay = min(BACKOFF_CAP, random.uniform(BACKOFF_BASE, delay * 3))
+        time.sleep(delay)
+
+# Only these columns are ever read; the raw tables carry ~65 columns per row.
+# Base holds the box score counts and shooting splits, Advanced the
+# per-possession ratings, so callers needing both must fetch both measures.
+BASE_COLS = ['PLAYER_ID', 'PLAYER_NAME', 'GP', 'MIN', 'PTS', 'FG_PCT', 'FG3_PCT', 'FT_PCT',
+             'AST', 'TOV', 'STL', 'BLK', 'DREB', 'REB', 'PLUS_MINUS']
+ADVANCED_COLS = ['PLAYER_ID', 'PLAYER_NAME', 'USG_PCT', 'TS_PCT', 'NET_RATING', 'OFF_RATING',
+                 'DEF_RATING', 'AST_PCT', 'PIE']
+LEAGUE_COLS = {'Base': BASE_COLS, 'Advanced': ADVANCED_COLS}
+SHOTCHART_COLS = ['SHOT_DISTANCE', 'SHOT_MADE_FLAG']
+
+def shared_cache(maxsize=128):
+    """
+    Thread-safe LRU memoization that also deduplicates in-flight calls.
+
+    The first caller for a set of arguments runs the function; any thread that
+    asks for the same arguments meanwhile waits on that call's Future instead of
+    issuing a duplicate request. Exceptions are passed to every waiter but not
+    cached, so a later call retries.
+    """
+    def decorator(func):
+        lock = threading.Lock()
+        futures = OrderedDict()  # key -> Future, least recently used first
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                future = futures.get(key)
+                owner = future is None
+                if owner:
+                    future = futures[key] = Future()
+                    if len(futures) > maxsize:
+                        futures.popitem(last=False)
+                else:
+                    futures.move_to_end(key)
+            if owner:
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    with lock:
+                        if futures.get(key) is future:
+                            del futures[key]
+                    future.set_exception(e)
+            return future.result()
+
+        def cache_clear():
+            with lock:
+                futures.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+def _project_league(df, measure):
+    # Older seasons may lack some columns (e.g. AST_PCT), so keep what exists
+    cols = [c for c in LEAGUE_COLS[measure] if c in df.columns]
+    return df.loc[:, cols].set_index('PLAYER_ID', drop=False).sort_index()
+
+@shared_cache(maxsize=128)
+def get_league_clutch(season, measure, per_mode='Totals'):
+    """
+    League-wide clutch stats (last 5 minutes, within 5 points) indexed by PLAYER_ID.
+
+    Parameters:
+    -----------
+    season : str
+        Season to fetch (e.g. '2021-22')
+    measure : str
+        'Base' or 'Advanced'
+    per_mode : str, optional
+        nba_api per_mode_detailed value (e.g. 'Per36'). Advanced columns are
+        rates that don't depend on it, so leave the default for Advanced and
+        every caller shares one table per season.
+    """
+    return _project_league(fetch_data_frame(
+        leaguedashplayerclutch.LeagueDashPlayerClutch,
+        season=season,
+        season_type_all_star='Regular Season',
+        measure_type_detailed_defense=measure,
+        clutch_time='Last 5 Minutes',
+        point_diff='5',
+        per_mode_detailed=per_mode
+    ), measure)
+
+@shared_cache(maxsize=128)
+def get_league_regular(season, measure, season_type='Regular Season', per_mode='Totals'):
+    """
+    League-wide full-game stats indexed by PLAYER_ID.
+
+    Parameters:
+    -----------
+    season : str
+        Season to fetch (e.g. '2021-22')
+    measure : str
+        'Base' or 'Advanced'
+    season_type : str, optional
+        'Regular Season' or 'Playoffs'
+    per_mode : str, optional
+        nba_api per_mode_detailed value (e.g. 'Per36')
+    """
+    return _project_league(fetch_data_frame(
+        leaguedashplayerstats.LeagueDashPlayerStats,
+        season=season,
+        season_type_all_star=season_type,
+        measure_type_detailed_defense=measure,
+        per_mode_detailed=per_mode
+    ), measure)
+
+@shared_cache(maxsize=128)
+def get_clutch_shot_chart(player_id, season):
+    """
+    A player's regular season clutch field goal attempts with distance and make flag.
+
+    SHOT_DISTANCE and SHOT_MADE_FLAG are narrowed from int64 to the dtypes
+    nba_kernels is compiled for.
+    """
+    shot_df = fetch_data_frame(
+        shotchartdetail.ShotChartDetail,
+        player_id=player_id,
+        team_id=0,
+        season_nullable=season,
+        season_type_all_star='Regular Season',
+        context_measure_simple='FGA',
+        clutch_time_nullable='Last 5 Minutes',
+        point_diff_nullable='5'
+    )
+    return shot_df.loc[:, SHOTCHART_COLS].astype({
+        'SHOT_DISTANCE': nba_kernels.SHOT_DISTANCE_DTYPE,
+        'SHOT_MADE_FLAG': nba_kernels.SHOT_MADE_DTYPE
+    })
+
+def player_rows(league_df, player_id):
+    """
+    Rows for one player from a get_league_* frame, empty if the player is absent.
+
+    Rows are matched by ID rather than name, so they always belong to the
+    player resolve_player picked, whatever spelling the caller used.
+    The frames are shared between callers, so treat the result as read-only.
+    """
+    if player_id in league_df.index:
+        return league_df.loc[[player_id]]
+    return league_df.iloc[:0]
+
+class ResultsStore:
+    """
+    A player's per-season endpoint rows persisted as Parquet files in one directory.
+
+    Files are named f"{endpoint}_{player_id}_{season}.parquet", so every caller
+    pointed at the same directory reuses rows another one already fetched.
+    Only non-empty rows from completed seasons are written: the season in
+    progress still changes, and "no rows" is cheap to re-check from the
+    league tables but would never expire once saved.
+    """
+    def __init__(self, cache_dir):
+        self.path = Path(cache_dir)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint, player_id, season):
+        return f"{endpoint}_{player_id}_{season}.parquet"
+
+    def get(self, key):
+        """
+        The stored frame for key, or None if it hasn't been stored.
+        """
+        path = self.path / key
+        return pd.read_parquet(path) if path.exists() else None
+
+    def put(self, key, df):
+        # Write then rename, so an interrupted run never leaves a truncated file behind
+        path = self.path / key
+        tmp = path.with_suffix('.tmp')
+        df.to_parquet(tmp, compression='zstd', index=False)
+        tmp.replace(path)
+
+    def get_or_fetch(self, endpoint, player_id, season, fetch):
+        """
+        Stored rows for (endpoint, player_id, season), calling fetch() and storing its result on a miss.
+        """
+        key = self.key(endpoint, player_id, season)
+        df = self.get(key)
+        # Empty files are treated as misses, so any left by older runs get refetched
+        if df is None or df.empty:
+            df = fetch()
+            if not df.empty and season != current_season():
+                self.put(key, df)
+        return df
@@ -0,0 +1,62 @@
+"""
+Compiled kernels for shot chart processing.
+
+numba is optional: without it the same results come from np.digitize and
+np.bincount, which are plenty fast for a single player's clutch shots.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Shot chart column dtypes the kernels are compiled for: distances fit in
+# 0-94 ft and the make flag is 0/1, so int64 would be 4-8x wider than needed
+SHOT_DISTANCE_DTYPE = np.int16
+SHOT_MADE_DTYPE = np.int8
+
+def _bin_and_count_numpy(dist, made, edges, out_fga, out_fgm):
+    bin_idx = np.digitize(dist, edges, right=True)
+    out_fga += np.bincount(bin_idx, minlength=out_fga.size)
+    out_fgm += np.bincount(bin_idx, weights=made, minlength=out_fgm.size).astype(np.int64)
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _bin_and_count(dist, made, edges, out_fga, out_fgm):
+        for k in range(dist.size):
+            d = dist[k]
+            b = 0
+            while b < edges.size and d > edges[b]:
+                b += 1
+            out_fga[b] += 1
+            out_fgm[b] += made[k]
+
+    # Compile for the shot chart column dtypes now so the first real call doesn't pay for it
+    _bin_and_count(np.zeros(1, dtype=SHOT_DISTANCE_DTYPE), np.zeros(1, dtype=SHOT_MADE_DTYPE), np.array([3, 10, 16, 23]),
+                   np.zeros(5, dtype=np.int64), np.zeros(5, dtype=np.int64))
+else:
+    _bin_and_count = _bin_and_count_numpy
+
+def bin_shot_distances(dist, made, edges):
+    """
+    Count attempts and makes per distance bin in a single pass.
+
+    Parameters:
+    -----------
+    dist : numpy.ndarray
+        Shot distances in feet (SHOT_DISTANCE_DTYPE)
+    made : numpy.ndarray
+        1 for a made shot, 0 for a miss (SHOT_MADE_DTYPE)
+    edges : numpy.ndarray
+        Inner bin edges; bin i holds edges[i-1] < d <= edges[i], the last bin is open-ended
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        (fga, fgm) int64 arrays of length len(edges) + 1
+    """
+    fga = np.zeros(len(edges) + 1, dtype=np.int64)
+    fgm = np.zeros(len(edges) + 1, dtype=np.int64)
+    _bin_and_count(dist, made, edges, fga, fgm)
+    return fga, fgm